@@ -1,8 +1,15 @@
 from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from yt_dlp import YoutubeDL
 import simplejson as json
 import pandas as pd
-import subprocess
+import numpy as np
+import itertools
+import threading
+import asyncio
+import shutil
+import queue
+import copy
 import sys
 import os
 
@@ -14,6 +21,8 @@ CWD = os.getcwd()
 RULES = {
     'MODE': 'new',
     'URL': '',
+    'BATCH': [],
+    'DAEMON-PORT': 8765,
     'DIFF-MODE': 'new',
     'DIFF-NEW': '',
     'DIFF-OLD': '',
@@ -33,20 +42,61 @@ RULES = {
     'BUFFER': './.tmp_dlbuf',
     'JSON-BUFFER': './.tmp_json',
 }
+# Untouched copy of RULES, used to reset it between daemon jobs
+DEFAULT_RULES = copy.deepcopy(RULES)
 
 SPOTIFY_TRACK_URL_PREFIX = 'https://open.spotify.com/track/'
 
+# Files kept in JSON-BUFFER by batch mode
+BATCH_SAVE_FILE = 'batch-{}.spotdl'
+BATCH_UNION_FILE = 'batch.spotdl'
+BATCH_INDEX_FILE = 'batch-index.json'
+
+# Fields of the yt-dlp metadata used for verification
+YT_FIELDS = ('title', 'creator', 'channel', 'album')
+
+# spotdl's save file for the downloaded songs, kept in JSON-BUFFER
+SAVE_FILE = 'download.spotdl'
+# Songs are matched against the save file this many at a time. This bounds
+# memory, at the cost of reading the save file once per batch.
+JOIN_BATCH = 10000
+
+# Tool : max number of processes running at once
+# yt-dlp runs in threads rather than processes, one metadata fetch each
+TOOL_LIMITS = {
+    'spotdl': 4,
+    'ffprobe': os.cpu_count() or 1,
+    'mp3gain': os.cpu_count() or 1,
+    'yt-dlp': 8,
+}
+# Tool : seconds before a process is killed, or None to wait forever
+TOOL_TIMEOUTS = {
+    'spotdl': None,
+    'ffprobe': 60,
+    'mp3gain': None,
+}
+
 # Delimiter used for parsing. Change this value to avoid conflicts
 DELIMITER = '%,,'
 
+# Version suffixes ignored by the normalized DIFF-LEVELs, matched after casefolding.
+# e.g. "Song - Remastered 2011", "Song (feat. Someone)", "Album (Deluxe Edition)"
+NORMALIZE_SUFFIX = (r'(\s+-\s+[^-]*\b(remaster(ed)?|live|mono|stereo|version|edit|mix|deluxe|edition)\b.*'
+                    r'|\s*[\(\[][^\(\[]*\b(remaster(ed)?|live|mono|stereo|version|edit|mix|deluxe|edition|feat\.?|ft\.?|with)\b[^\)\]]*[\)\]])+$')
+# Values that need more than lower() and strip() to be normalized:
+# non-ascii, repeated whitespace, artist lists, and possible suffixes
+NORMALIZE_SPECIAL = r'[^\x00-\x7f]|\s\s|\t|,| - |[\(\[]'
+
 ## Rule types ##
 
 # Note that rules are mutually exlusive; any rule should only fall under one category
 TAKES_BOOL = set(['MP3GAIN'])
-TAKES_INT = set(['DIFF-LEVEL', 'VERIFY-LEVEL', 'VERIFY-IGNORE-MISSING-URL', 'SKIP'])
+TAKES_INT = set(['DIFF-LEVEL', 'VERIFY-LEVEL', 'VERIFY-IGNORE-MISSING-URL', 'SKIP', 'DAEMON-PORT'])
 TAKES_FILE = {
     'new': [],
     'diff': ['DIFF-NEW', 'DIFF-OLD'],
+    'batch': [],
+    'daemon': [],
 }
 # Mode : ([rules], when to warn not empty instead of error
 TAKES_DIR = {
@@ -54,17 +104,22 @@ TAKES_DIR = {
             lambda: int(RULES['SKIP']) > 0),
     'diff': ([],
             lambda: False),
+    'batch': (['MANUAL-BUFFER', 'BUFFER', 'JSON-BUFFER'],
+            lambda: int(RULES['SKIP']) > 0),
+    'daemon': ([],
+            lambda: False),
 }
 
 # Rule : set([options])
 TAKES_STR = {
-    'MODE': set(['new', 'diff']),
+    'MODE': set(['new', 'diff', 'batch', 'daemon']),
     'DIFF-MODE': set(['new', 'old', 'diff', 'common']),
     'SKIP_TO': '',
 }
 
 # Rule : (checking function, error descriptor)
 TAKES_ARRAY = {
+    'BATCH': (lambda s: '|' in s, "must contain '|'"),
     'IGNORE-MISMATCH': (lambda s: SPOTIFY_TRACK_URL_PREFIX in s, "must be Spotify url"),
     'REPLACE': (lambda s: '|' in s, "must contain '|'"),
     'RENAME': (lambda s: ':' in s, "must contain ':'"),
@@ -82,16 +137,24 @@ def main():
 
     parser(filename, RULES)
 
+    if RULES['MODE'] == 'daemon':
+        daemon(RULES['DAEMON-PORT'])
+    else:
+        run()
+
+# Run the mode set in RULES
+# If job is given, its progress is updated as each step finishes
+def run(job=None):
     if RULES['MODE'] == 'new':
         # Note that because all function arguments are set immediately after parsing,
         # modifying RULES will not affect the function calls
         # [ (func, [ params ]), ]
         funcs = [
-            (download_songs, [ RULES['URL'], RULES['BUFFER'] ]),
+            (download_songs, [ RULES['URL'], RULES['BUFFER'], RULES['JSON-BUFFER'] ]),
             (manual_relace_songs, [ RULES['REPLACE'] ]),
             (download_metadata, [ RULES['JSON-BUFFER'] ]),
             (verify, [ RULES['VERIFY-LEVEL'], RULES['IGNORE-MISMATCH'] ]),
-            (remove_ids, [ RULES['BUFFER'] ]),
+            (remove_ids, [ RULES['BUFFER'], RULES['MANUAL-BUFFER'] ]),
             (rename, [ RULES['BUFFER'], RULES['MANUAL-BUFFER'], RULES['RENAME'] ]),
             (combine_and_clean, [ RULES['DIR'], RULES['BUFFER'], RULES['MANUAL-BUFFER'], RULES['JSON-BUFFER'] ]),
             (mp3gain, [ RULES['MP3GAIN'], RULES['DIR'] ]),
@@ -99,10 +162,39 @@ def main():
 
         # Executes the functions in func
         # Done this way to implement SKIP
-        list(map(lambda z: z[0](*z[1]), funcs[RULES['SKIP']:]))
+        run_steps(funcs[RULES['SKIP']:], job)
+
+    if RULES['MODE'] == 'batch':
+        # Same steps as new, run once over the union of every playlist.
+        # mp3gain runs on the buffers before the songs are placed, so that
+        # each unique song is only normalized once.
+        index = os.path.join(RULES['JSON-BUFFER'], BATCH_INDEX_FILE)
+        funcs = [
+            (download_batch, [ RULES['BATCH'], RULES['BUFFER'], RULES['JSON-BUFFER'] ]),
+            (manual_relace_songs, [ RULES['REPLACE'] ]),
+            (download_metadata, [ RULES['JSON-BUFFER'] ]),
+            (verify, [ RULES['VERIFY-LEVEL'], RULES['IGNORE-MISMATCH'] ]),
+            (remove_ids, [ RULES['BUFFER'], RULES['MANUAL-BUFFER'], index ]),
+            (rename, [ RULES['BUFFER'], RULES['MANUAL-BUFFER'], RULES['RENAME'], index ]),
+            (mp3gain, [ RULES['MP3GAIN'], RULES['BUFFER'], RULES['MANUAL-BUFFER'] ]),
+            (batch_combine_and_clean, [ RULES['BATCH'], RULES['BUFFER'], RULES['MANUAL-BUFFER'], RULES['JSON-BUFFER'] ]),
+        ]
+
+        run_steps(funcs[RULES['SKIP']:], job)
 
     if RULES['MODE'] == 'diff':
-        diff(RULES['DIFF-MODE'], RULES['DIFF-NEW'], RULES['DIFF-OLD'], RULES['DIFF-LEVEL'])
+        run_steps([ (diff, [ RULES['DIFF-MODE'], RULES['DIFF-NEW'], RULES['DIFF-OLD'], RULES['DIFF-LEVEL'] ]) ], job)
+
+# Call each (func, [ params ]) in order
+def run_steps(funcs, job=None):
+    if job is not None:
+        job.total = len(funcs)
+    for func, params in funcs:
+        if job is not None:
+            job.step = func.__name__
+        func(*params)
+        if job is not None:
+            job.done += 1
 
 ### \Main ###
 
@@ -141,20 +233,131 @@ def mv(old, new):
     else:
         print(f'FileWarning: {old} does not exist. No change')
 
-# Helper function to call spotdl
+# Wrapper function for copying files
+def cp(old, new):
+    print(f'filesystem: cp {old} {new}')
+    if os.path.isfile(old):
+        shutil.copy2(old, new)
+    else:
+        print(f'FileWarning: {old} does not exist. No change')
+
+# Helper function to call spotdl in dir
 def spotdl(dir, *args):
-    os.chdir(CWD)
-    os.chdir(dir)
-    try:
-        subprocess.run(['spotdl', *args])
-    except FileNotFoundError:
+    check_spotdl(TOOLS.run_sync(['spotdl', *args], cwd=dir, capture=False))
+
+# Exit if spotdl could not be run
+def check_spotdl(result):
+    if result.status == 'missing':
         print('Error: spotdl not found. Is spotdl installed?')
         exit(1)
-    os.chdir(CWD)
 
 ### \Helper ###
 
 
+### Subprocesses ###
+
+# Outcome of running a tool
+# status is one of 'ok', 'failed', 'timeout' or 'missing'
+class ToolResult:
+    __slots__ = ('args', 'status', 'returncode', 'stdout', 'stderr')
+
+    def __init__(self, args, status, returncode=None, stdout='', stderr=''):
+        self.args = args
+        self.status = status
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+# Runs every external tool as an asyncio subprocess.
+# Each call is given its own working directory, so calls can safely overlap,
+# and the number of processes per tool is bounded by TOOL_LIMITS.
+class ToolManager:
+    def __init__(self, limits, timeouts):
+        self.limits = limits
+        self.timeouts = timeouts
+        self.loop = None
+        self.semaphores = {}
+
+    def semaphore(self, tool):
+        if tool not in self.semaphores:
+            self.semaphores[tool] = asyncio.Semaphore(self.limits.get(tool, 1))
+        return self.semaphores[tool]
+
+    # Run a single command. Output is captured unless capture is False,
+    # in which case it goes straight to the terminal.
+    async def run(self, args, cwd=None, capture=True):
+        tool = os.path.basename(args[0])
+        pipe = asyncio.subprocess.PIPE if capture else None
+        async with self.semaphore(tool):
+            try:
+                proc = await asyncio.create_subprocess_exec(*args, cwd=cwd, stdout=pipe, stderr=pipe)
+            except FileNotFoundError:
+                return ToolResult(args, 'missing')
+
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), self.timeouts.get(tool))
+            except asyncio.TimeoutError:
+                await self.kill(proc)
+                return ToolResult(args, 'timeout')
+            except asyncio.CancelledError:
+                await self.kill(proc)
+                raise
+
+        stdout = stdout.decode(errors='replace') if stdout is not None else ''
+        stderr = stderr.decode(errors='replace') if stderr is not None else ''
+        status = 'ok' if proc.returncode == 0 else 'failed'
+        return ToolResult(args, status, proc.returncode, stdout, stderr)
+
+    async def kill(self, proc):
+        if proc.returncode is None:
+            proc.kill()
+        await proc.wait()
+
+    # [ (args, { kwargs }) ] -> [ ToolResult ], in the same order
+    async def run_all(self, jobs):
+        return await asyncio.gather(*[ self.run(args, **kwargs) for args, kwargs in jobs ])
+
+    # Call func(*args) in a thread, bounded by the limit of tool.
+    # For libraries such as yt-dlp, which are not run as a process.
+    # There is no timeout, since a thread cannot be killed.
+    async def call(self, tool, func, *args):
+        async with self.semaphore(tool):
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    # [ (args) ] -> [ func(*args) ], in the same order
+    async def call_all(self, tool, func, args):
+        return await asyncio.gather(*[ self.call(tool, func, *a) for a in args ])
+
+    # Blocking wrappers. Interrupting cancels the jobs and kills their processes.
+    def run_sync(self, args, **kwargs):
+        return self.wait(self.run(args, **kwargs))
+
+    def run_all_sync(self, jobs):
+        return self.wait(self.run_all(jobs))
+
+    def call_all_sync(self, tool, func, args):
+        return self.wait(self.call_all(tool, func, args))
+
+    def wait(self, coro):
+        # A single loop is kept, since the semaphores belong to it
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        task = self.loop.create_task(coro)
+        try:
+            return self.loop.run_until_complete(task)
+        except KeyboardInterrupt:
+            task.cancel()
+            try:
+                self.loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+            raise
+
+TOOLS = ToolManager(TOOL_LIMITS, TOOL_TIMEOUTS)
+
+### \Subprocesses ###
+
+
 ### Parsing ###
 
 # Sets the RULES dictionary
@@ -196,6 +399,9 @@ def parser(filename, rules):
         elif rule in TAKES_ARRAY:
             errors += array_check(rule, setting)
 
+    if rules['MODE'] == 'batch':
+        errors += batch_check(rules['BATCH'])
+
     # Handle errors
     if len(errors) > 0:
         print(errors, end='')
@@ -288,17 +494,68 @@ def array_check(rule, setting):
             return f'Error: {rule} {TAKES_ARRAY[rule][1]}.\nFailed on: {s}\n'
     return ''
 
+# Target directories in batch mode are refreshed, so they may already hold songs
+def batch_check(setting):
+    if len(setting) == 0:
+        return 'Error: BATCH must not be empty in batch mode.\n'
+    for url, dir in parse_batch(setting):
+        if url == '' or dir == '':
+            return f'Error: BATCH entries must be of the form url | dir.\nFailed on: {url} | {dir}\n'
+        if not os.path.isdir(dir):
+            mkdir(dir)
+    return ''
+
+# Split the BATCH array into [ (url, dir) ]
+def parse_batch(batch):
+    return [ (s.split('|', 1)[0].strip(), s.split('|', 1)[1].strip()) for s in batch ]
+
 ### \Parsing ###
 
 
 ### Download songs ###
 
 # Download songs into a buffer
-def download_songs(url, buffer):
+# The metadata of every song is saved to json_buffer for verification
+def download_songs(url, buffer, json_buffer):
     if len(os.listdir(buffer)) > 0:
         print(f'Error: {buffer} is not empty.')
         exit(1)
-    spotdl(buffer, '--output', RULES['OUTPUT-FORMAT']+'.{track-id}', url)
+    spotdl(buffer, '--output', RULES['OUTPUT-FORMAT']+'.{track-id}',
+           '--save-file', os.path.join(CWD, json_buffer, SAVE_FILE), url)
+
+# Download the union of every playlist in the batch into a buffer
+def download_batch(batch, buffer, json_buffer):
+    # Fetch the track list of each playlist; this does not download any songs
+    jobs = [ (['spotdl', 'save', url, '--save-file', BATCH_SAVE_FILE.format(i)],
+              { 'cwd': json_buffer, 'capture': False })
+            for i, (url, _) in enumerate(parse_batch(batch)) ]
+    failed = False
+    for i, ((url, _), result) in enumerate(zip(parse_batch(batch), TOOLS.run_all_sync(jobs))):
+        check_spotdl(result)
+        if result.status != 'ok' or not os.path.isfile(os.path.join(json_buffer, BATCH_SAVE_FILE.format(i))):
+            print(f'Error: Could not get the track list of {url}. Is the playlist public?')
+            failed = True
+    if failed:
+        exit(1)
+
+    # Keep the first occurrence of each song
+    union = {}
+    for songs in get_batch_songs(batch, json_buffer):
+        for song in songs:
+            union.setdefault(song['song_id'], song)
+    print(f'Batch: {len(union)} unique song(s) across {len(batch)} playlist(s)')
+
+    union_file = os.path.join(CWD, json_buffer, BATCH_UNION_FILE)
+    with open(union_file, 'w') as f:
+        f.write(json.dumps(list(union.values())))
+
+    # spotdl accepts a save file as a query
+    download_songs(union_file, buffer, json_buffer)
+
+# Iterate over the saved track list of each playlist in the batch
+def get_batch_songs(batch, json_buffer):
+    for i in range(len(batch)):
+        yield iter_save_file(os.path.join(json_buffer, BATCH_SAVE_FILE.format(i)))
 
 ### \Download songs ###
 
@@ -323,7 +580,7 @@ def manual_relace_songs(replace_list):
 def replace_songs(spotids):
     # Download the replacements into a separate buffer
     for spotid, url in spotids.items():
-        spotdl(RULES['MANUAL-BUFFER'], '--output', RULES['OUTPUT-FORMAT'],
+        spotdl(RULES['MANUAL-BUFFER'], '--output', RULES['OUTPUT-FORMAT']+'.{track-id}',
                url + '|' + SPOTIFY_TRACK_URL_PREFIX + spotid)
         # Delete the replaced song from the main buffer
         for file in os.listdir(RULES['BUFFER']):
@@ -338,57 +595,201 @@ def replace_songs(spotids):
 ### Download metadata ###
 
 # Use yt-dlp to download the metadata of the songs in the buffer
+# Songs are fetched a few at a time, so that yt-dlp runs concurrently
 def download_metadata(json_buffer):
-    # { filename: (title, artist, album, url)}
-    metadata = get_ffprobe_data()
-    fileurls = { file: data[3] for file, data in metadata.items() }
-
-    with YoutubeDL() as ydl:
-        i = 1
-        for filename, url in fileurls.items():
-            if url == '': url = handle_missing_url(filename)
-            print(f'Downloading metadata for ({i}/{len(fileurls)})')
-            i += 1
-
-            # write to file
-            with open(os.path.join(json_buffer, filename + '.json'), 'w') as f:
-                f.write(json.dumps(ydl.sanitize_info(
-                    ydl.extract_info(url, download=False))))
-
-# Get the metadata of the songs in the buffer using ffprobe
-# { filename: (title, artist, album, url)}
-@lru_cache(maxsize=1)
-def get_ffprobe_data():
-    metadata = {}
-
-    # Download the metadata of the songs in the buffer
+    total = len(os.listdir(RULES['BUFFER']))
+    tracks = iter_spotify_data()
+    step = TOOL_LIMITS['yt-dlp'] * 4
+
+    i = 1
+    while True:
+        batch = list(itertools.islice(tracks, step))
+        if len(batch) == 0:
+            return
+        # Missing urls are asked for before fetching, one song at a time
+        urls = [ track.url or handle_missing_url(track.file) for track in batch ]
+        print(f'Downloading metadata for ({i}-{i + len(batch) - 1}/{total})')
+        i += len(batch)
+
+        for track, info in zip(batch, TOOLS.call_all_sync('yt-dlp', get_yt_info, [ (url,) for url in urls ])):
+            # write to file, along with the Spotify metadata so verification
+            # does not need to probe the song again
+            data = { **info, 'spotify': [track.title, track.artist, track.album, track.url] }
+            with open(os.path.join(json_buffer, track.file + '.json'), 'w') as f:
+                f.write(json.dumps(data))
+
+# Get the fields in YT_FIELDS for a url using yt-dlp
+# Cached, so that a daemon does not fetch the same video twice
+@lru_cache(maxsize=1 << 16)
+def get_yt_info(url):
+    info = youtube_dl().extract_info(url, download=False)
+    return { field: info[field] for field in YT_FIELDS if info.get(field) is not None }
+
+YOUTUBE_DL = threading.local()
+
+# The YoutubeDL instance of the current thread, since they are not thread-safe
+# The threads are reused between downloads, so each instance stays warm
+def youtube_dl():
+    if not hasattr(YOUTUBE_DL, 'instance'):
+        YOUTUBE_DL.instance = YoutubeDL()
+    return YOUTUBE_DL.instance
+
+# Compact record of the metadata of a song
+# The YouTube fields are only filled in during verification
+class Track:
+    __slots__ = ('file', 'title', 'artist', 'album', 'url',
+                 'yt_title', 'yt_creator', 'yt_channel', 'yt_album')
+
+    def __init__(self, file, title='', artist='', album='', url=''):
+        self.file = file
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.url = url
+        self.yt_title = ''
+        self.yt_creator = ''
+        self.yt_channel = ''
+        self.yt_album = ''
+
+# Iterate over the metadata of the songs in the buffer, one Track at a time
+# spotdl's save file is used where possible, and ffprobe for anything missing from it
+def iter_spotify_data():
+    with os.scandir(RULES['BUFFER']) as entries:
+        names = (entry.name for entry in entries)
+        while True:
+            files = list(itertools.islice(names, JOIN_BATCH))
+            if len(files) == 0:
+                return
+            yield from iter_spotify_batch(files)
+
+def iter_spotify_batch(files):
+    # { spotify_id: filename }
+    ids = {}
+    unnamed = []
+    for file in files:
+        if len(file.split('.')) >= 3:
+            ids[file.split('.')[-2]] = file
+        else:
+            unnamed.append(file)
+
+    save_file = os.path.join(RULES['JSON-BUFFER'], SAVE_FILE)
+    if os.path.isfile(save_file):
+        for song in iter_save_file(save_file):
+            # Songs without a download url are probed instead
+            if song.get('song_id') not in ids or not song.get('download_url'):
+                continue
+            yield Track(ids.pop(song['song_id']), song.get('name') or '',
+                        ', '.join(song.get('artists') or []),
+                        song.get('album_name') or '', song['download_url'])
+
+    # Reuse the metadata kept by download_metadata
+    rest = []
+    for file in [ *ids.values(), *unnamed ]:
+        data = get_saved_spotify_data(file)
+        if data is None:
+            rest.append(file)
+        else:
+            yield Track(file, *data)
+
+    # Probe the rest a few at a time, so that ffprobe runs concurrently
+    step = TOOL_LIMITS['ffprobe'] * 4
+    for i in range(0, len(rest), step):
+        files = rest[i:i+step]
+        for file, data in zip(files, ffprobe_all([ os.path.join(RULES['BUFFER'], file) for file in files ])):
+            track = Track(file, *data)
+            print(f'{file}: {track.title} - {track.artist} - {track.album} - {track.url}')
+            yield track
+
+# Get the Spotify metadata that download_metadata kept in a song's json
+# (title, artist, album, url), or None
+def get_saved_spotify_data(file):
+    filename = os.path.join(RULES['JSON-BUFFER'], file + '.json')
+    if not os.path.isfile(filename):
+        return None
+    with open(filename, 'r') as f:
+        return json.load(f).get('spotify')
+
+# Get the metadata of songs using ffprobe
+# [ (title, artist, album, url) ]
+def ffprobe_all(files):
     ffprobe_cmd = ['ffprobe', '-v', '0', '-show_entries', 'format']
-    
-    for file in os.listdir(RULES['BUFFER']):
-        title = ''
-        artist = ''
-        album = ''
-        url = ''
-
-        result = subprocess.run(ffprobe_cmd + [os.path.join(RULES['BUFFER'], file)], capture_output=True, text=True)
-        if result.returncode != 0:
+    results = TOOLS.run_all_sync([ (ffprobe_cmd + [file], {}) for file in files ])
+    return [ ffprobe_tags(result) for result in results ]
+
+# Read the tags out of ffprobe's output
+# (title, artist, album, url)
+def ffprobe_tags(result):
+    title = ''
+    artist = ''
+    album = ''
+    url = ''
+
+    match result.status:
+        case 'missing':
+            print('Error: ffprobe not found. Is ffmpeg installed?')
+            exit(5)
+        case 'timeout':
+            print(f'Error: ffprobe timed out on {result.args[-1]}')
+            exit(5)
+        case 'failed':
             print(result.stderr)
             exit(5)
 
-        for line in result.stdout.split('\n'):
-            if line.startswith('TAG:title='):
-                title = line.split('TAG:title=')[1]
-            elif line.startswith('TAG:artist='):
-                artist = line.split('TAG:artist=')[1]
-            elif line.startswith('TAG:album='):
-                album = line.split('TAG:album=')[1]
-            elif line.startswith('TAG:comment=https://'):
-                url = line.split('TAG:comment=')[1]
+    for line in result.stdout.split('\n'):
+        if line.startswith('TAG:title='):
+            title = line.split('TAG:title=')[1]
+        elif line.startswith('TAG:artist='):
+            artist = line.split('TAG:artist=')[1]
+        elif line.startswith('TAG:album='):
+            album = line.split('TAG:album=')[1]
+        elif line.startswith('TAG:comment=https://'):
+            url = line.split('TAG:comment=')[1]
+
+    return (title, artist, album, url)
+
+# Iterate over the songs in a spotdl save file, which is a json array,
+# without loading the whole file into memory
+def iter_save_file(filename, chunk_size=1 << 16):
+    decoder = json.JSONDecoder()
+    with open(filename, 'r') as f:
+        # Skip any whitespace before the opening bracket
+        buf = ''
+        while buf == '':
+            chunk = f.read(chunk_size)
+            buf = chunk.lstrip()
+            if chunk == '':
+                break
+        if not buf.startswith('['): # ] to fix syntax highlighting
+            print(f'Error: {filename} is not a spotdl save file.')
+            exit(5)
+
+        # Songs are decoded in place from pos; the buffer is only trimmed
+        # when another chunk is read
+        pos = 1
+        eof = False
 
-        metadata[file] = (title, artist, album, url)
-        print(f'{file}: {title} - {artist} - {album} - {url}')
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) and buf[pos] == ']':
+                return
+
+            # Decode the next song, reading more of the file if it is incomplete
+            try:
+                if pos == len(buf):
+                    raise json.JSONDecodeError('Expecting value', buf, pos)
+                song, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    print(f'Error: {filename} is not a valid spotdl save file.')
+                    exit(5)
+                chunk = f.read(chunk_size)
+                eof = chunk == ''
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
 
-    return metadata
+            yield song
 
 def handle_missing_url(filename):
     url = ''
@@ -428,23 +829,21 @@ def verify(level, ignore_mismatch):
 
     ignore_mismatch = [s.replace(SPOTIFY_TRACK_URL_PREFIX, '') for s in ignore_mismatch]
 
-    # { filename: (title, artist, album, url)}
-    metadata = get_ffprobe_data()
-    # { filename: (title, creator, channel, album)}
-    yt_metadata = get_yt_data()
-
     # Make sure that title and artist match
+    # Songs are joined with their YouTube metadata one at a time,
+    # and only those queued for verification are kept
     verification_queue = []
-    for file, data in zip(metadata.keys(), metadata.values()):
-        if queue_for_verification(level, file, data, yt_metadata[file], ignore_mismatch):
-            verification_queue.append(file)
+    for track in iter_spotify_data():
+        get_yt_data(track)
+        if queue_for_verification(level, track, ignore_mismatch):
+            verification_queue.append(track)
 
     # Prompt the user to verify the songs
     if len(verification_queue) == 0:
         return
 
     # { spotify_id: youtube_url }
-    new_yt_urls, ignore_mismatch = verification_prompt(verification_queue, metadata, yt_metadata, ignore_mismatch)
+    new_yt_urls, ignore_mismatch = verification_prompt(verification_queue, ignore_mismatch)
     if len(new_yt_urls) == 0 and len(ignore_mismatch) == 0:
         return
 
@@ -470,38 +869,29 @@ def verify(level, ignore_mismatch):
 
     replace_songs(new_yt_urls)
 
-# Get the metadata of the songs in the buffer from the downloaded json
-# { filename: (title, creator, channel, album)}
-def get_yt_data():
-    metadata = {}
-
-    # extract metadata
-    for file in os.listdir(RULES['JSON-BUFFER']):
-        if not file.endswith('.json'): continue
-        with open(os.path.join(RULES['JSON-BUFFER'], file), 'r') as f:
-            data = json.load(f)
-            title, creator, channel, album = '', '', '', ''
-            if 'title' in data:
-                title = data['title']
-            if 'creator' in data:
-                creator = data['creator']
-            if 'channel' in data:
-                channel = data['channel']
-            if 'album' in data:
-                album = data['album']
-
-            filename = '.'.join(file.split('.')[:-1])
-            metadata[filename] = (title, creator, channel, album)
-
-    return metadata
-
-# Check if the file should be queued for verification
-def queue_for_verification(level, file, metadata, yt_metadata, ignore_mismatch):
-    if '.'.join(file.split('.')[:-2]) in ignore_mismatch:
+# Fill in the YouTube metadata of a track from its downloaded json
+def get_yt_data(track):
+    filename = os.path.join(RULES['JSON-BUFFER'], track.file + '.json')
+    if not os.path.isfile(filename):
+        return
+    with open(filename, 'r') as f:
+        data = json.load(f)
+    if 'title' in data:
+        track.yt_title = data['title']
+    if 'creator' in data:
+        track.yt_creator = data['creator']
+    if 'channel' in data:
+        track.yt_channel = data['channel']
+    if 'album' in data:
+        track.yt_album = data['album']
+
+# Check if the track should be queued for verification
+def queue_for_verification(level, track, ignore_mismatch):
+    if '.'.join(track.file.split('.')[:-2]) in ignore_mismatch:
         return False
 
-    title, artist, album, url = metadata
-    yt_title, yt_creator, yt_channel, yt_album = yt_metadata
+    title, artist, album, url = track.title, track.artist, track.album, track.url
+    yt_title, yt_creator, yt_channel, yt_album = track.yt_title, track.yt_creator, track.yt_channel, track.yt_album
 
     match level:
         case 1:
@@ -521,15 +911,16 @@ def queue_for_verification(level, file, metadata, yt_metadata, ignore_mismatch):
             exit(4)
 
 # Prompt the user to verify the songs
-def verification_prompt(queue, metadata, yt_metadata, ignore_mismatch):
+def verification_prompt(queue, ignore_mismatch):
     new_yt_urls = {}
 
     print()
     print()
     print(f'{len(queue)} song(s) may need verification.')
-    for file in queue:
-        title, artist, album, url = metadata[file]
-        yt_title, yt_creator, yt_channel, yt_album = yt_metadata[file]
+    for track in queue:
+        file = track.file
+        title, artist, album, url = track.title, track.artist, track.album, track.url
+        yt_title, yt_creator, yt_channel, yt_album = track.yt_title, track.yt_creator, track.yt_channel, track.yt_album
         print()
         print(f'{file}: {url}')
         print('Spotify: ')
@@ -579,33 +970,55 @@ def verification_prompt(queue, metadata, yt_metadata, ignore_mismatch):
 
 ### Remove IDs ###
 
-# Remove IDs from the files in the buffer
-def remove_ids(buffer):
-    for file in os.listdir(buffer):
-        if len(file.split('.')) < 3:
-            continue
-        mv(os.path.join(buffer, file),
-           os.path.join(buffer, '.'.join(file.split('.')[:-2]) + '.' + file.split('.')[-1]))
+# Remove IDs from the files in the buffers
+# If index is given, the files keep their IDs and { file: name } is written
+# to it instead. Batch mode strips the IDs as the songs are placed, since two
+# songs of the union may only differ by their ID.
+def remove_ids(buffer, manual_buffer, index=None):
+    names = {}
+    for b in [buffer, manual_buffer]:
+        for file in os.listdir(b):
+            name, spotid = split_id(file)
+            if spotid == '':
+                continue
+            if index is None:
+                mv(os.path.join(b, file), os.path.join(b, name))
+            else:
+                names[file] = name
+
+    if index is not None:
+        with open(index, 'w') as f:
+            f.write(json.dumps(names))
+
+# 'name.{track-id}.ext' -> ('name.ext', track-id), or (file, '') without an ID
+def split_id(file):
+    if len(file.split('.')) < 3:
+        return file, ''
+    return '.'.join(file.split('.')[:-2]) + '.' + file.split('.')[-1], file.split('.')[-2]
 
 ### \Remove IDs ###
 
 
 ### Rename ###
 
-def rename(buffer, manual_buffer, rename_list):
+# If index is given, the names in it are renamed instead of the files
+def rename(buffer, manual_buffer, rename_list, index=None):
     # Split rename_list into rename_map
     rename_map = { name.split(':')[0].strip(): name.split(':')[1].strip() for name in rename_list }
 
     # { old_name : new_name }
-    new_renames = rename_non_ascii(buffer, manual_buffer, rename_map)
+    if index is not None:
+        new_renames = rename_index(index, rename_map)
+    else:
+        new_renames = rename_non_ascii(buffer, manual_buffer, rename_map)
 
-    # Automatic rename remaining
-    for file in os.listdir(buffer):
-        if file in rename_map:
-            mv(os.path.join(buffer, file), os.path.join(buffer, rename_map[file]))
-    for file in os.listdir(manual_buffer):
-        if file in rename_map:
-            mv(os.path.join(manual_buffer, file), os.path.join(manual_buffer, rename_map[file]))
+        # Automatic rename remaining
+        for file in os.listdir(buffer):
+            if file in rename_map:
+                mv(os.path.join(buffer, file), os.path.join(buffer, rename_map[file]))
+        for file in os.listdir(manual_buffer):
+            if file in rename_map:
+                mv(os.path.join(manual_buffer, file), os.path.join(manual_buffer, rename_map[file]))
 
     # Give opportunity to copy the rename list
     if len(new_renames) > 0:
@@ -624,7 +1037,7 @@ def rename_non_ascii(buffer, manual_buffer, rename_map):
     rename_buffer = [ file for file in os.listdir(buffer) if any(ord(char) > 127 for char in file) ]
     rename_manual_buffer = [ file for file in os.listdir(manual_buffer) if any(ord(char) > 127 for char in file) ]
     new_renames = {}
-    
+
     for file in rename_buffer:
         name = ''
         if file in rename_map:
@@ -644,6 +1057,28 @@ def rename_non_ascii(buffer, manual_buffer, rename_map):
 
     return new_renames
 
+# Same as rename_non_ascii and the automatic rename, applied to the names in
+# the batch index. Songs sharing a name are only prompted for once.
+def rename_index(index, rename_map):
+    with open(index, 'r') as f:
+        names = json.load(f)
+    new_renames = {}
+
+    for file, name in names.items():
+        if any(ord(char) > 127 for char in name):
+            if name in rename_map:
+                name = rename_map[name]
+            elif name in new_renames:
+                name = new_renames[name]
+            else:
+                new_renames[name] = rename_prompt(name)
+                name = new_renames[name]
+        names[file] = rename_map.get(name, name)
+
+    with open(index, 'w') as f:
+        f.write(json.dumps(names))
+    return new_renames
+
 # Prompt to get the new name
 def rename_prompt(file):
     print()
@@ -684,8 +1119,6 @@ def rename_prompt(file):
 
 # Combine the directories and remove the buffers
 def combine_and_clean(dir, buffer, manual_buffer, json_buffer):
-    os.chdir(CWD)
-
     # Move everything to dir
     for file in os.listdir(buffer):
         mv(f'{buffer}/{file}', f'{dir}/{file}')
@@ -700,27 +1133,79 @@ def combine_and_clean(dir, buffer, manual_buffer, json_buffer):
 
     # Remove all json metadata
     for file in os.listdir(json_buffer):
-        if file.endswith('.json'):
+        if file.endswith('.json') or file.endswith('.spotdl'):
             rm(f'{json_buffer}/{file}')
     if dir != json_buffer:
         rmdir(json_buffer)
 
-    os.chdir(CWD)
+# Place every song into the directory of each playlist that contains it,
+# then remove the buffers
+def batch_combine_and_clean(batch, buffer, manual_buffer, json_buffer):
+    # { spotify_id: [ dir ] }
+    dirs = {}
+    for (_, dir), songs in zip(parse_batch(batch), get_batch_songs(batch, json_buffer)):
+        for song in songs:
+            if dir not in dirs.setdefault(song['song_id'], []):
+                dirs[song['song_id']].append(dir)
+
+    # { file: name }, where file still has its ID
+    with open(os.path.join(json_buffer, BATCH_INDEX_FILE), 'r') as f:
+        names = json.load(f)
+
+    # { dir: set([ name ]) } placed so far, so that a song never replaces
+    # another song of the batch with the same name
+    placed = {}
+    for b in [buffer, manual_buffer]:
+        for file in os.listdir(b):
+            targets = dirs.get(split_id(file)[1], [])
+            if len(targets) == 0:
+                print(f'FileWarning: {b}/{file} is not in any playlist. No change')
+                continue
+
+            paths = []
+            for dir in targets:
+                name = names.get(file, file)
+                if name in placed.setdefault(dir, set()):
+                    print(f'FileWarning: {dir}/{name} is another song with the same name. Keeping the ID as {dir}/{file}')
+                    name = file
+                placed[dir].add(name)
+                paths.append(f'{dir}/{name}')
+
+            # Copy to all but the last directory, then move
+            for path in paths[:-1]:
+                cp(f'{b}/{file}', path)
+            mv(f'{b}/{file}', paths[-1])
+
+    # Remove the buffers, leaving any that still hold songs
+    for b in [buffer, manual_buffer]:
+        if len(os.listdir(b)) == 0:
+            rmdir(b)
+
+    # Remove all json metadata and saved track lists
+    for file in os.listdir(json_buffer):
+        if file.endswith('.json') or file.endswith('.spotdl'):
+            rm(f'{json_buffer}/{file}')
+    rmdir(json_buffer)
 
 ### \Combine and clean ###
 
 
 ### MP3GAIN ###
 
-# Apply mp3gain
-def mp3gain(yes, dir):
+# Apply mp3gain to each directory, all at once
+def mp3gain(yes, *dirs):
     if not yes:
         return
 
-    os.chdir(CWD)
-    os.chdir(dir)
-    subprocess.run('mp3gain -r *', shell=True)
-    os.chdir(CWD)
+    jobs = [ (['mp3gain', '-r', *sorted(os.listdir(dir))], { 'cwd': dir, 'capture': False })
+            for dir in dirs if len(os.listdir(dir)) > 0 ]
+    for result in TOOLS.run_all_sync(jobs):
+        match result.status:
+            case 'missing':
+                print('Error: mp3gain not found. Is mp3gain installed?')
+                exit(7)
+            case 'failed':
+                print(f'Warning: mp3gain exited with {result.returncode}')
 
 ### \MP3GAIN ###
 
@@ -728,60 +1213,213 @@ def mp3gain(yes, dir):
 ### Diff ###
 
 def diff(mode, new, old, level):
-    new = pd.read_csv(new)
-    old = pd.read_csv(old)
+    new = read_csv(new, os.path.getmtime(new))
+    old = read_csv(old, os.path.getmtime(old))
 
     # Decide what to use to find the diff
     match level:
         case 1: diff_cond = ('Track URI',)
-        case 2: diff_cond = ('Track Name', 'Artist Name(s)', 'Album Name')
-        case 3: diff_cond = ('Track Name', 'Artist Name(s)')
-        case 4: diff_cond = ('Track Name',)
+        case 2 | 5: diff_cond = ('Track Name', 'Artist Name(s)', 'Album Name')
+        case 3 | 6: diff_cond = ('Track Name', 'Artist Name(s)')
+        case 4 | 7: diff_cond = ('Track Name',)
         case _: diff_cond = ('Track URI',)
 
-    # Keep track of spotify ids to later match up with the diff
-    new_map = { tuple(row): new['Track URI'][i] for i, row in
-               enumerate(new[[*diff_cond]].itertuples(index=False, name=None)) }
-    old_map = { tuple(row): old['Track URI'][i] for i, row in
-               enumerate(old[[*diff_cond]].itertuples(index=False, name=None)) }
-    # Note that [[*diff_cond]].itertuples needs to be copy-pasted later.
-    # This is because the dict comprehension uses up the iterator.
-
-    # Grab the data needed
-    new_diff = set(new[[*diff_cond]].itertuples(index=False, name=None))
-    old_diff = set(old[[*diff_cond]].itertuples(index=False, name=None))
+    # One integer key per row, so that the diff is a hash join on a single column
+    new_keys, old_keys = diff_keys(new, old, diff_cond, level in (5, 6, 7))
+    new = new.assign(key=new_keys)
+    old = old.assign(key=old_keys)
+    new_only = ~new['key'].isin(old['key'])
+    old_only = ~old['key'].isin(new['key'])
 
     # Find the diff
     match mode:
-        case 'new': diff = new_diff - old_diff
-        case 'old': diff = old_diff - new_diff
-        case 'diff': diff = new_diff ^ old_diff
-        case 'common': diff = new_diff & old_diff
+        case 'new': diff = new[new_only]
+        case 'old': diff = old[old_only]
+        case 'diff': diff = pd.concat([new[new_only], old[old_only]])
+        case 'common': diff = new[~new_only]
         case _:
             print(f'Invalid diff mode: {mode}')
             exit(3)
 
-    # Convert to a list of ids
-    diff_ids = [ new_map[row] if row in new_map else old_map[row] for row in diff ]
+    # Songs with the same key are only listed once
+    diff = diff.drop_duplicates('key')
 
     print('Spotify ID,Title,Artist,Album')
-    for id in diff_ids:
-        new_row = new.loc[new['Track URI'] == id]
-        old_row = old.loc[old['Track URI'] == id]
-        match mode:
-            case 'new': row = new_row
-            case 'old': row = old_row
-            case 'diff': row = new_row if len(new_row) > 0 else old_row
-            case 'common': row = new_row
-            case _:
-                print(f'Invalid diff mode: {mode}')
-                exit(3)
-
-        row = row.iloc[0]
-        print(f'{row["Track URI"]}, {row["Track Name"]}, {row["Artist Name(s)"]}, {row["Album Name"]}')
+    for row in diff[['Track URI', 'Track Name', 'Artist Name(s)', 'Album Name']].itertuples(index=False, name=None):
+        print(', '.join(map(str, row)))
+
+# Read a csv, cached until the file is modified
+@lru_cache(maxsize=16)
+def read_csv(filename, mtime):
+    return pd.read_csv(filename)
+
+# Give each row an integer key from the columns in diff_cond
+# Both csvs are keyed together, so that equal rows get equal keys
+def diff_keys(new, old, diff_cond, normalized):
+    keys = np.zeros(len(new) + len(old), dtype=np.int64)
+    for col in diff_cond:
+        codes, values = pd.factorize(pd.concat([new[col], old[col]], ignore_index=True), use_na_sentinel=False)
+        if normalized:
+            # Normalize each distinct value once; values that normalize the same share a code
+            codes = pd.factorize(normalize_column(pd.Series(values), col))[0][codes]
+
+        # Combine with the previous columns, renumbering first if it could overflow
+        if len(keys) > 0 and int(keys.max()) * (len(values) + 1) >= 1 << 62:
+            keys = pd.factorize(keys)[0]
+        keys = keys * (len(values) + 1) + codes
+    return keys[:len(new)], keys[len(new):]
+
+# Casefold, strip accents and collapse whitespace for a whole column at once,
+# then sort artist lists or strip version suffixes depending on the column.
+# Most values only need lower() and strip(); one regex pass finds the few
+# that need more, and only those go through the slow steps.
+def normalize_column(col, name):
+    col = col.fillna('').astype(str).str.lower()
+    special = col.str.contains(NORMALIZE_SPECIAL, regex=True)
+    col = col.str.strip()
+    sub = col[special]
+
+    # For ascii, NFKD does nothing and casefold is the same as lower
+    accented = sub.str.contains(r'[^\x00-\x7f]', regex=True)
+    sub[accented] = (sub[accented].str.normalize('NFKD')
+                     .str.replace('[\u0300-\u036f]', '', regex=True)
+                     .str.casefold())
+
+    spaced = accented | sub.str.contains('  ', regex=False) | sub.str.contains('\t', regex=False)
+    sub[spaced] = sub[spaced].str.replace(r'\s+', ' ', regex=True).str.strip()
+
+    if name == 'Artist Name(s)':
+        # Artist order does not matter. Only lists with several artists need
+        # sorting, and map() is much faster here than the .str list methods.
+        several = sub.str.contains(',', regex=False)
+        sub[several] = (sub[several].str.replace(r'\s*,\s*', ',', regex=True)
+                        .map(lambda s: ','.join(sorted(s.split(',')))))
+    else:
+        sub = sub.str.replace(NORMALIZE_SUFFIX, '', regex=True).str.strip()
+    return col.where(~special, sub)
 
 ### \Diff ###
 
 
+### Daemon ###
+
+# A job submitted to the daemon
+# status is one of 'queued', 'running', 'done' or 'failed'
+class Job:
+    __slots__ = ('id', 'rules', 'status', 'mode', 'step', 'done', 'total', 'error')
+
+    def __init__(self, id, rules):
+        self.id = id
+        self.rules = rules
+        self.status = 'queued'
+        self.mode = ''
+        self.step = ''
+        self.done = 0
+        self.total = 0
+        self.error = ''
+
+    def to_dict(self):
+        return { slot: getattr(self, slot) for slot in self.__slots__ }
+
+JOBS = {}
+JOB_QUEUE = queue.Queue()
+JOBS_LOCK = threading.Lock()
+
+# Keep pandas, yt-dlp and the caches loaded, and run jobs from a local http endpoint
+# POST /jobs {"rules": "path/to/file.rules"} queues the rules file as a job
+# GET /jobs and GET /jobs/<id> return the status and progress of jobs
+def daemon(port):
+    threading.Thread(target=job_worker, daemon=True).start()
+    server = ThreadingHTTPServer(('127.0.0.1', port), DaemonHandler)
+    print(f'daemon: listening on http://127.0.0.1:{port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+# Run queued jobs one at a time, since every job shares RULES
+def job_worker():
+    while True:
+        job = JOB_QUEUE.get()
+        job.status = 'running'
+        print(f'daemon: starting job {job.id} ({job.rules})')
+
+        RULES.clear()
+        RULES.update(copy.deepcopy(DEFAULT_RULES))
+        try:
+            parser(job.rules, RULES)
+            job.mode = RULES['MODE']
+            if job.mode == 'daemon':
+                raise ValueError('MODE=daemon cannot be run as a job')
+            run(job)
+            job.status = 'done'
+        # The pipeline exits on errors, which must not stop the daemon
+        except SystemExit as e:
+            job.status = 'failed'
+            job.error = f'exited with {e.code}'
+        except Exception as e:
+            job.status = 'failed'
+            job.error = f'{type(e).__name__}: {e}'
+        print(f'daemon: job {job.id} {job.status}')
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # Copied under the lock, since POST /jobs may add a job meanwhile
+        with JOBS_LOCK:
+            jobs = dict(JOBS)
+        if self.path == '/jobs':
+            self.respond(200, [ job.to_dict() for job in jobs.values() ])
+            return
+        id = self.path.removeprefix('/jobs/')
+        if id.isdigit() and int(id) in jobs:
+            self.respond(200, jobs[int(id)].to_dict())
+        else:
+            self.respond(404, { 'error': 'no such job' })
+
+    def do_POST(self):
+        if self.path != '/jobs':
+            self.respond(404, { 'error': 'not found' })
+            return
+        # Browsers send Origin with every POST, and a web page can only send
+        # a json content type after a preflight, which is never answered.
+        # Either way, no web page can queue a job.
+        if self.headers.get('Origin') is not None:
+            self.respond(403, { 'error': 'requests from browsers are not accepted' })
+            return
+        if self.headers.get_content_type() != 'application/json':
+            self.respond(415, { 'error': 'expected Content-Type: application/json' })
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            rules = os.path.join(CWD, body['rules'])
+        except (ValueError, KeyError, TypeError):
+            self.respond(400, { 'error': 'expected {"rules": "path/to/file.rules"}' })
+            return
+        if not os.path.isfile(rules):
+            self.respond(400, { 'error': f'{rules} not found' })
+            return
+
+        with JOBS_LOCK:
+            job = Job(len(JOBS) + 1, rules)
+            JOBS[job.id] = job
+        JOB_QUEUE.put(job)
+        self.respond(202, job.to_dict())
+
+    def respond(self, code, data):
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Job output already goes to the terminal
+    def log_message(self, format, *args):
+        pass
+
+### \Daemon ###
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,87 @@
+"""Throughput of the diff keys and join for every DIFF-LEVEL.
+
+    python tests/bench_diff.py [rows] [--distinct]
+
+Two csvs of `rows` rows are built, the second a shuffle of the first.
+rows/s counts the rows of one csv, so 1M rows/s diffs two 1M-row playlists
+in a second. By default artists and albums repeat like in a real library. --distinct makes almost every value unique, which is the
+worst case for the normalized levels.
+"""
+import importlib.util
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEVELS = {
+    1: ('Track URI',),
+    2: ('Track Name', 'Artist Name(s)', 'Album Name'),
+    3: ('Track Name', 'Artist Name(s)'),
+    4: ('Track Name',),
+    5: ('Track Name', 'Artist Name(s)', 'Album Name'),
+    6: ('Track Name', 'Artist Name(s)'),
+    7: ('Track Name',),
+}
+REPEAT = 3
+SUFFIXES = ['', '', '', ' - Remastered 2011', ' (feat. Someone)', ' - Live']
+
+
+def load_helper():
+    spec = importlib.util.spec_from_file_location('spotdl_helper', os.path.join(ROOT, 'spotdl-helper.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def playlist(rows, distinct):
+    random.seed(0)
+    artists = [f'Artist {i}' for i in range(rows if distinct else 20000)]
+    collabs = [', '.join(random.sample(artists, random.choice([2, 3]))) for _ in range(rows if distinct else 5000)]
+
+    def artist(i):
+        if random.random() < (0.4 if distinct else 0.25):
+            return random.choice(collabs)
+        return artists[i % len(artists)] if distinct else random.choice(artists)
+
+    return pd.DataFrame({
+        'Track URI': [f'spotify:track:{i:022d}' for i in range(rows)],
+        'Track Name': [f'Song {i}{random.choice(SUFFIXES)}' for i in range(rows)],
+        'Artist Name(s)': [artist(i) for i in range(rows)],
+        'Album Name': [f'Album {i % (rows if distinct else 50000)}' for i in range(rows)],
+    })
+
+
+def main():
+    rows = int(next((a for a in sys.argv[1:] if a.isdigit()), 1_000_000))
+    distinct = '--distinct' in sys.argv
+    helper = load_helper()
+
+    new = playlist(rows, distinct)
+    old = new.sample(frac=1, random_state=1).reset_index(drop=True)
+    # Round trip through csv so the dtypes match those of read_csv
+    new.to_csv('/tmp/bench_new.csv', index=False)
+    old.to_csv('/tmp/bench_old.csv', index=False)
+    new = pd.read_csv('/tmp/bench_new.csv')
+    old = pd.read_csv('/tmp/bench_old.csv')
+
+    print(f'pandas {pd.__version__}, {new["Track Name"].dtype} dtype, {rows} rows per csv'
+          f'{", distinct values" if distinct else ""}')
+    for level, diff_cond in LEVELS.items():
+        # Fastest of a few runs, since other processes add noise
+        elapsed = float('inf')
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            new_keys, old_keys = helper.diff_keys(new, old, diff_cond, level in (5, 6, 7))
+            new['key'] = new_keys
+            old['key'] = old_keys
+            new['key'].isin(old['key'])
+            old['key'].isin(new['key'])
+            elapsed = min(elapsed, time.perf_counter() - start)
+        print(f'DIFF-LEVEL {level}: {elapsed:.2f}s, {rows / elapsed / 1e6:.2f}M rows/s')
+
+
+if __name__ == '__main__':
+    main()
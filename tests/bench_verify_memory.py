@@ -0,0 +1,87 @@
+"""Peak memory of verify() as the number of songs grows.
+
+    python tests/bench_verify_memory.py [tracks ...]
+
+Synthetic songs are built for each size: empty files in BUFFER, a spotdl
+save file and one yt-dlp json per song, all matching so nothing is queued
+for review. verify() then runs in a fresh process, so building the songs
+does not count. Both the peak of Python allocations during verify() and the
+peak RSS of the process should stay roughly flat.
+"""
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_helper():
+    spec = importlib.util.spec_from_file_location('spotdl_helper', os.path.join(ROOT, 'spotdl-helper.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build(helper, tracks, dir):
+    buffer = os.path.join(dir, 'buffer')
+    json_buffer = os.path.join(dir, 'json')
+    os.mkdir(buffer)
+    os.mkdir(json_buffer)
+    helper.RULES['BUFFER'] = buffer
+    helper.RULES['JSON-BUFFER'] = json_buffer
+
+    songs = []
+    for i in range(tracks):
+        file = f'Song {i} - Artist {i % 997}.id{i}.mp3'
+        open(os.path.join(buffer, file), 'w').close()
+        songs.append({
+            'song_id': f'id{i}', 'name': f'Song {i}', 'artists': [f'Artist {i % 997}'],
+            'album_name': f'Album {i % 5003}', 'download_url': f'https://music.youtube.com/watch?v={i}',
+            'lyrics': 'la ' * 200,
+        })
+        with open(os.path.join(json_buffer, file + '.json'), 'w') as f:
+            json.dump({ 'title': f'Song {i}', 'creator': f'Artist {i % 997}',
+                        'channel': f'Artist {i % 997}', 'album': f'Album {i % 5003}' }, f)
+    with open(os.path.join(json_buffer, helper.SAVE_FILE), 'w') as f:
+        json.dump(songs, f)
+
+
+def peak_rss():
+    # ru_maxrss keeps the high-water mark of the parent across fork and exec,
+    # VmHWM belongs to this process only. Both are in KiB.
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1])
+
+
+def measure(tracks, dir):
+    helper = load_helper()
+    helper.RULES['BUFFER'] = os.path.join(dir, 'buffer')
+    helper.RULES['JSON-BUFFER'] = os.path.join(dir, 'json')
+    before = peak_rss()
+    tracemalloc.start()
+    helper.verify(6, [])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f'{tracks} tracks: {peak / 2**20:.1f} MiB allocated at peak during verify(), '
+          f'peak RSS {before / 1024:.0f} -> {peak_rss() / 1024:.0f} MiB')
+
+
+def main():
+    if len(sys.argv) > 3 and sys.argv[1] == '--one':
+        measure(int(sys.argv[2]), sys.argv[3])
+        return
+    helper = load_helper()
+    for tracks in [ int(a) for a in sys.argv[1:] ] or [1000, 10000, 100000]:
+        with tempfile.TemporaryDirectory() as dir:
+            build(helper, tracks, dir)
+            subprocess.run([sys.executable, __file__, '--one', str(tracks), dir], check=True)
+
+
+if __name__ == '__main__':
+    main()
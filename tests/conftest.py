@@ -0,0 +1,31 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# spotdl-helper.py is a script, not an importable module
+@pytest.fixture(scope='session')
+def helper():
+    spec = importlib.util.spec_from_file_location('spotdl_helper', os.path.join(ROOT, 'spotdl-helper.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Puts executable shell scripts on PATH in place of the external tools
+# stub('ffprobe', 'echo TAG:title=x') creates ./bin/ffprobe
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    monkeypatch.setenv('PATH', f'{bin_dir}{os.pathsep}{os.environ["PATH"]}')
+
+    def make(name, script):
+        path = bin_dir / name
+        path.write_text(f'#!/bin/sh\n{script}\n')
+        path.chmod(0o755)
+        return path
+    return make
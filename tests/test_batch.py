@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+
+def make_batch(helper, tmp_path, playlists, files):
+    buffer = tmp_path / 'buffer'
+    manual_buffer = tmp_path / 'manual'
+    json_buffer = tmp_path / 'json'
+    for dir in [buffer, manual_buffer, json_buffer]:
+        dir.mkdir()
+    batch = []
+    for i, (dir, ids) in enumerate(playlists.items()):
+        (tmp_path / dir).mkdir()
+        batch.append(f'https://open.spotify.com/playlist/{i} | {tmp_path / dir}')
+        (json_buffer / helper.BATCH_SAVE_FILE.format(i)).write_text(json.dumps([ { 'song_id': id } for id in ids ]))
+    for file in files:
+        (buffer / file).write_text(file)
+    return batch, buffer, manual_buffer, json_buffer
+
+
+def test_shared_songs_are_copied_into_every_playlist(helper, tmp_path):
+    batch, buffer, manual_buffer, json_buffer = make_batch(helper, tmp_path,
+        { 'p1': ['s1', 's2'], 'p2': ['s2', 's3'] },
+        ['One - A.s1.mp3', 'Two - B.s2.mp3', 'Three - C.s3.mp3', 'Extra - D.s4.mp3'])
+    index = str(json_buffer / helper.BATCH_INDEX_FILE)
+
+    helper.remove_ids(str(buffer), str(manual_buffer), index)
+    helper.batch_combine_and_clean(batch, str(buffer), str(manual_buffer), str(json_buffer))
+
+    assert sorted(os.listdir(tmp_path / 'p1')) == ['One - A.mp3', 'Two - B.mp3']
+    assert sorted(os.listdir(tmp_path / 'p2')) == ['Three - C.mp3', 'Two - B.mp3']
+    # Songs in no playlist stay in the buffer, with their ID
+    assert os.listdir(buffer) == ['Extra - D.s4.mp3']
+    assert not json_buffer.exists()
+
+
+def test_songs_with_the_same_name_are_all_placed(helper, tmp_path, capsys):
+    # An album and a single version of the same song
+    batch, buffer, manual_buffer, json_buffer = make_batch(helper, tmp_path,
+        { 'p1': ['s1', 's2'], 'p2': ['s2', 's3'], 'p3': ['s1', 's3'] },
+        ['Same - Art.s1.mp3', 'Song - B.s2.mp3', 'Same - Art.s3.mp3'])
+    index = str(json_buffer / helper.BATCH_INDEX_FILE)
+
+    helper.remove_ids(str(buffer), str(manual_buffer), index)
+    helper.batch_combine_and_clean(batch, str(buffer), str(manual_buffer), str(json_buffer))
+
+    assert sorted(os.listdir(tmp_path / 'p1')) == ['Same - Art.mp3', 'Song - B.mp3']
+    assert sorted(os.listdir(tmp_path / 'p2')) == ['Same - Art.mp3', 'Song - B.mp3']
+    assert (tmp_path / 'p1' / 'Same - Art.mp3').read_text() == 'Same - Art.s1.mp3'
+    assert (tmp_path / 'p2' / 'Same - Art.mp3').read_text() == 'Same - Art.s3.mp3'
+    # Both are in p3, so one of them keeps its ID
+    p3 = sorted(os.listdir(tmp_path / 'p3'))
+    assert len(p3) == 2 and 'Same - Art.mp3' in p3
+    assert 'same name' in capsys.readouterr().out
+
+
+def test_rename_from_rules_renames_batch_index(helper, tmp_path):
+    buffer = tmp_path / 'buffer'
+    manual_buffer = tmp_path / 'manual'
+    buffer.mkdir()
+    manual_buffer.mkdir()
+    (buffer / 'Café - X.id1.mp3').write_text('')
+    (buffer / 'Other - Y.id2.mp3').write_text('')
+    index = tmp_path / helper.BATCH_INDEX_FILE
+
+    helper.remove_ids(str(buffer), str(manual_buffer), str(index))
+    helper.rename(str(buffer), str(manual_buffer), ['Café - X.mp3 : Cafe - X.mp3', 'Other - Y.mp3 : Y.mp3'], str(index))
+
+    # The files keep their IDs until they are placed
+    assert sorted(os.listdir(buffer)) == ['Café - X.id1.mp3', 'Other - Y.id2.mp3']
+    assert json.loads(index.read_text()) == { 'Café - X.id1.mp3': 'Cafe - X.mp3', 'Other - Y.id2.mp3': 'Y.mp3' }
+
+
+def test_failed_playlist_save_exits(helper, tmp_path, capsys, stub):
+    # Fails for private playlists, otherwise saves an empty track list
+    stub('spotdl', 'case "$2" in *private*) exit 1;; esac\necho "[]" > "$4"')
+
+    json_buffer = tmp_path / 'json'
+    json_buffer.mkdir()
+    batch = ['https://open.spotify.com/playlist/public | a', 'https://open.spotify.com/playlist/private | b']
+    with pytest.raises(SystemExit):
+        helper.download_batch(batch, str(tmp_path / 'buffer'), str(json_buffer))
+
+    out = capsys.readouterr().out
+    assert 'playlist/private' in out
+    assert 'playlist/public' not in out
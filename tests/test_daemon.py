@@ -0,0 +1,53 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+JSON = { 'Content-Type': 'application/json' }
+
+
+@pytest.fixture
+def jobs_url(helper, monkeypatch):
+    monkeypatch.setattr(helper, 'JOBS', {})
+    monkeypatch.setattr(helper, 'JOB_QUEUE', helper.queue.Queue())
+    server = ThreadingHTTPServer(('127.0.0.1', 0), helper.DaemonHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/jobs'
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body, headers):
+    request = urllib.request.Request(url, body.encode(), headers, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_jobs_endpoint(helper, tmp_path, jobs_url):
+    rules = tmp_path / 'job.rules'
+    rules.write_text('MODE=diff\n')
+
+    status, job = post(jobs_url, json.dumps({ 'rules': str(rules) }), JSON)
+    assert status == 202
+    with urllib.request.urlopen(jobs_url) as response:
+        assert [ j['id'] for j in json.load(response) ] == [job['id']]
+    with urllib.request.urlopen(f'{jobs_url}/{job["id"]}') as response:
+        assert json.load(response)['status'] == 'queued'
+
+
+def test_browser_requests_are_rejected(helper, tmp_path, jobs_url):
+    rules = tmp_path / 'job.rules'
+    rules.write_text('MODE=diff\n')
+    body = json.dumps({ 'rules': str(rules) })
+
+    # A form on a web page
+    assert post(jobs_url, body, { 'Content-Type': 'application/x-www-form-urlencoded' })[0] == 415
+    assert post(jobs_url, body, { 'Content-Type': 'text/plain' })[0] == 415
+    assert post(jobs_url, body, { **JSON, 'Origin': 'https://example.com' })[0] == 403
+    assert helper.JOB_QUEUE.empty()
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+COLUMNS = ['Track URI', 'Track Name', 'Artist Name(s)', 'Album Name']
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+def run_diff(helper, capsys, mode, new, old, level):
+    helper.read_csv.cache_clear()
+    helper.diff(mode, new, old, level)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == 'Spotify ID,Title,Artist,Album'
+    return lines[1:]
+
+
+@pytest.fixture
+def playlist():
+    return [
+        ['spotify:track:a', 'Song A', 'Artist 1', 'Album A'],
+        ['spotify:track:b', 'Song B', 'Artist 2, Artist 3', 'Album B'],
+    ]
+
+
+@pytest.mark.parametrize('level', [1, 2, 3, 4, 5, 6, 7, 9])
+@pytest.mark.parametrize('mode', ['new', 'old', 'diff'])
+def test_identical_csvs_have_empty_diff(helper, capsys, tmp_path, playlist, mode, level):
+    new = write_csv(tmp_path / 'new.csv', playlist)
+    old = write_csv(tmp_path / 'old.csv', playlist)
+    assert run_diff(helper, capsys, mode, new, old, level) == []
+
+
+def test_diff_with_changes_on_one_side(helper, capsys, tmp_path, playlist):
+    new = write_csv(tmp_path / 'new.csv', playlist + [['spotify:track:c', 'Song C', 'Artist 4', 'Album C']])
+    old = write_csv(tmp_path / 'old.csv', playlist)
+    assert run_diff(helper, capsys, 'diff', new, old, 1) == ['spotify:track:c, Song C, Artist 4, Album C']
+    assert run_diff(helper, capsys, 'old', new, old, 1) == []
+    assert len(run_diff(helper, capsys, 'common', new, old, 1)) == 2
+
+
+def test_normalized_levels_ignore_formatting(helper, capsys, tmp_path):
+    new = write_csv(tmp_path / 'new.csv', [
+        ['spotify:track:a', 'Café  Song - Remastered 2011', 'B Artist, A Artist', 'Album (Deluxe Edition)'],
+    ])
+    old = write_csv(tmp_path / 'old.csv', [
+        ['spotify:track:z', 'cafe song', 'A Artist, B Artist', 'album'],
+    ])
+    assert len(run_diff(helper, capsys, 'new', new, old, 2)) == 1
+    assert run_diff(helper, capsys, 'new', new, old, 5) == []
+
+
+def test_out_of_range_level_matches_uri_exactly(helper, capsys, tmp_path):
+    new = write_csv(tmp_path / 'new.csv', [['spotify:track:aB', 'Song', 'Artist', 'Album']])
+    old = write_csv(tmp_path / 'old.csv', [['spotify:track:Ab', 'Song', 'Artist', 'Album']])
+    assert len(run_diff(helper, capsys, 'new', new, old, 9)) == 1
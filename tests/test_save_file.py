@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+SONGS = [{ 'song_id': str(i), 'name': 'Song, [with] "brackets" ]' * (i % 3), 'artists': ['A', 'B'] } for i in range(200)]
+
+
+@pytest.mark.parametrize('indent', [None, 4])
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+def test_iter_save_file(helper, tmp_path, chunk_size, indent):
+    save_file = tmp_path / 'download.spotdl'
+    save_file.write_text(json.dumps(SONGS, indent=indent))
+    assert list(helper.iter_save_file(str(save_file), chunk_size)) == SONGS
+
+
+@pytest.mark.parametrize('text', ['[]', ' [ ]\n'])
+def test_iter_empty_save_file(helper, tmp_path, text):
+    save_file = tmp_path / 'download.spotdl'
+    save_file.write_text(text)
+    assert list(helper.iter_save_file(str(save_file), 1)) == []
+
+
+def test_iter_truncated_save_file_exits(helper, tmp_path):
+    save_file = tmp_path / 'download.spotdl'
+    save_file.write_text(json.dumps(SONGS)[:-20])
+    with pytest.raises(SystemExit):
+        list(helper.iter_save_file(str(save_file), 64))
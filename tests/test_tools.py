@@ -0,0 +1,78 @@
+import time
+
+LIMITS = { 'spotdl': 4, 'ffprobe': 4, 'mp3gain': 4 }
+TIMEOUTS = { 'spotdl': None, 'ffprobe': 60, 'mp3gain': None }
+
+# Marks itself as started, then waits for every tool to have started.
+# Run one after the other, the first would give up and fail.
+WAIT_FOR_ALL = '''touch "{started}/$(basename "$0")"
+i=0
+while [ "$(ls "{started}" | wc -l)" -lt 3 ]; do
+    i=$((i + 1))
+    [ $i -gt 100 ] && exit 1
+    sleep 0.05
+done
+pwd'''
+
+
+def test_tools_overlap_in_their_own_directories(helper, tmp_path, stub):
+    started = tmp_path / 'started'
+    started.mkdir()
+    dirs = []
+    for tool in ['ffprobe', 'spotdl', 'mp3gain']:
+        stub(tool, WAIT_FOR_ALL.format(started=started))
+        dir = tmp_path / f'{tool}-cwd'
+        dir.mkdir()
+        dirs.append(dir)
+
+    tools = helper.ToolManager(LIMITS, TIMEOUTS)
+    jobs = [ ([tool], { 'cwd': str(dir) }) for tool, dir in zip(['ffprobe', 'spotdl', 'mp3gain'], dirs) ]
+    results = tools.run_all_sync(jobs)
+
+    assert [ r.status for r in results ] == ['ok', 'ok', 'ok']
+    assert [ r.stdout.strip() for r in results ] == [ str(dir) for dir in dirs ]
+
+
+def test_tool_limit_is_respected(helper, tmp_path, stub):
+    # mkdir fails if another ffprobe still holds the lock
+    lock = tmp_path / 'lock'
+    stub('ffprobe', f'mkdir "{lock}" || exit 1\nsleep 0.1\nrmdir "{lock}"')
+
+    tools = helper.ToolManager({ **LIMITS, 'ffprobe': 1 }, TIMEOUTS)
+    results = tools.run_all_sync([ (['ffprobe'], {}) for _ in range(3) ])
+
+    assert [ r.status for r in results ] == ['ok', 'ok', 'ok']
+
+
+def test_missing_failed_and_timeout(helper, stub):
+    stub('mp3gain', 'exit 2')
+    stub('ffprobe', 'exec sleep 5')
+
+    tools = helper.ToolManager(LIMITS, { **TIMEOUTS, 'ffprobe': 0.2 })
+    start = time.monotonic()
+    missing, failed, timeout = tools.run_all_sync([
+        (['spotdl-helper-no-such-tool'], {}), (['mp3gain'], {}), (['ffprobe'], {}),
+    ])
+
+    assert missing.status == 'missing'
+    assert (failed.status, failed.returncode) == ('failed', 2)
+    assert timeout.status == 'timeout'
+    assert time.monotonic() - start < 4
+
+
+def test_calls_overlap_up_to_the_limit(helper):
+    running = []
+    peak = []
+
+    def fetch(url):
+        running.append(url)
+        peak.append(len(running))
+        time.sleep(0.05)
+        running.remove(url)
+        return url.upper()
+
+    tools = helper.ToolManager({ **LIMITS, 'yt-dlp': 3 }, TIMEOUTS)
+    results = tools.call_all_sync('yt-dlp', fetch, [ (f'url{i}',) for i in range(9) ])
+
+    assert results == [ f'URL{i}' for i in range(9) ]
+    assert max(peak) == 3
@@ -0,0 +1,62 @@
+import json
+import threading
+
+YT_INFO = { 'title': 'Song', 'creator': 'Artist', 'channel': 'Artist', 'album': 'Album' }
+
+
+def test_songs_missing_from_save_file_are_probed_once(helper, tmp_path, monkeypatch, stub):
+    buffer = tmp_path / 'buffer'
+    json_buffer = tmp_path / 'json'
+    buffer.mkdir()
+    json_buffer.mkdir()
+    for i in range(3):
+        (buffer / f'Song - Artist.id{i}.mp3').write_text('')
+    # Only id0 is in the save file
+    (json_buffer / helper.SAVE_FILE).write_text(json.dumps([{
+        'song_id': 'id0', 'name': 'Song', 'artists': ['Artist'], 'album_name': 'Album',
+        'download_url': 'https://music.youtube.com/watch?v=0',
+    }]))
+
+    log = tmp_path / 'ffprobe.log'
+    stub('ffprobe', f'echo "$@" >> {log}\n'
+                    'printf "TAG:title=Song\\nTAG:artist=Artist\\nTAG:album=Album\\n'
+                    'TAG:comment=https://music.youtube.com/watch?v=1\\n"')
+    monkeypatch.setitem(helper.RULES, 'BUFFER', str(buffer))
+    monkeypatch.setitem(helper.RULES, 'JSON-BUFFER', str(json_buffer))
+    monkeypatch.setattr(helper, 'get_yt_info', lambda url: YT_INFO)
+
+    helper.download_metadata(str(json_buffer))
+    helper.verify(6, [])
+
+    probed = sorted(line.split('/')[-1] for line in log.read_text().splitlines())
+    assert probed == ['Song - Artist.id1.mp3', 'Song - Artist.id2.mp3']
+
+
+def test_metadata_is_fetched_concurrently(helper, tmp_path, monkeypatch):
+    buffer = tmp_path / 'buffer'
+    json_buffer = tmp_path / 'json'
+    buffer.mkdir()
+    json_buffer.mkdir()
+    songs = []
+    for i in range(6):
+        (buffer / f'Song {i} - Artist.id{i}.mp3').write_text('')
+        songs.append({ 'song_id': f'id{i}', 'name': f'Song {i}', 'artists': ['Artist'],
+                       'album_name': 'Album', 'download_url': f'https://music.youtube.com/watch?v={i}' })
+    (json_buffer / helper.SAVE_FILE).write_text(json.dumps(songs))
+    monkeypatch.setitem(helper.RULES, 'BUFFER', str(buffer))
+    monkeypatch.setitem(helper.RULES, 'JSON-BUFFER', str(json_buffer))
+
+    # Every fetch waits for another one to start, so one at a time would hang
+    barrier = threading.Barrier(2, timeout=5)
+    def get_yt_info(url):
+        barrier.wait()
+        return { **YT_INFO, 'title': url }
+    monkeypatch.setattr(helper, 'get_yt_info', get_yt_info)
+    monkeypatch.setattr(helper, 'TOOLS', helper.ToolManager({ **helper.TOOL_LIMITS, 'yt-dlp': 2 }, helper.TOOL_TIMEOUTS))
+
+    helper.download_metadata(str(json_buffer))
+
+    for i in range(6):
+        data = json.loads((json_buffer / f'Song {i} - Artist.id{i}.mp3.json').read_text())
+        assert data['title'] == f'https://music.youtube.com/watch?v={i}'
+        assert data['spotify'] == [f'Song {i}', 'Artist', 'Album', f'https://music.youtube.com/watch?v={i}']